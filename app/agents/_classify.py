@@ -0,0 +1,102 @@
+"""Single-pass query classifier for the routing and analysis nodes.
+
+All keyword sets are merged into one compiled alternation, so a query is
+scanned exactly once regardless of how many categories it is checked
+against; matched keywords are mapped back to their categories through a
+precomputed table built at import time.
+"""
+import re
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+GRAPH_KEYWORDS = [
+    "what is", "define", "explain", "concept", "theory",
+    "relationship", "how does", "compare", "difference between"
+]
+INTERNET_KEYWORDS = [
+    "latest", "recent", "news", "update", "current", "2024", "2025",
+    "today", "yesterday", "this week", "this month", "trending"
+]
+DEFINITION_KEYWORDS = ["what is", "define", "explain"]
+INSTRUCTION_KEYWORDS = ["how to", "steps", "guide"]
+COMPARISON_KEYWORDS = ["compare", "difference", "vs"]
+COMPLEXITY_KEYWORDS = ["complex", "advanced", "detailed"]
+CURRENT_INFO_KEYWORDS = ["latest", "recent", "news", "update"]
+
+_CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "graph": GRAPH_KEYWORDS,
+    "internet": INTERNET_KEYWORDS,
+    "definition": DEFINITION_KEYWORDS,
+    "instruction": INSTRUCTION_KEYWORDS,
+    "comparison": COMPARISON_KEYWORDS,
+    "complexity": COMPLEXITY_KEYWORDS,
+    "current_info": CURRENT_INFO_KEYWORDS,
+}
+
+def _build_keyword_table() -> Dict[str, Tuple[str, ...]]:
+    categories: Dict[str, Set[str]] = {}
+    for category, keywords in _CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            categories.setdefault(keyword, set()).add(category)
+
+    # The alternation matches longest-first, so a hit on "difference
+    # between" must also count for the shorter "difference" it contains.
+    for keyword, cats in categories.items():
+        for other, other_cats in categories.items():
+            if other != keyword and other in keyword:
+                cats.update(other_cats)
+
+    return {keyword: tuple(cats) for keyword, cats in categories.items()}
+
+_KEYWORD_CATEGORIES = _build_keyword_table()
+
+# The alternation sits inside a lookahead so matches may overlap -
+# a plain scan would let "how to" consume the "to" of "today" and miss
+# the second keyword entirely. At any one position the longest keyword
+# still wins, which the containment propagation above accounts for.
+_KEYWORD_RE = re.compile(
+    "(?=("
+    + "|".join(
+        re.escape(keyword)
+        for keyword in sorted(_KEYWORD_CATEGORIES, key=len, reverse=True)
+    )
+    + "))",
+    re.IGNORECASE
+)
+
+class QueryClassification(NamedTuple):
+    needs_graph: bool
+    needs_internet: bool
+    intent: str
+    complexity: str
+    needs_current_info: bool
+
+def classify(query: str) -> QueryClassification:
+    """Classify a query in a single scan of its text"""
+    categories: Set[str] = set()
+    for match in _KEYWORD_RE.finditer(query):
+        categories.update(_KEYWORD_CATEGORIES[match.group(1).lower()])
+
+    if "definition" in categories:
+        intent = "definition"
+    elif "instruction" in categories:
+        intent = "instructions"
+    elif "comparison" in categories:
+        intent = "comparison"
+    else:
+        intent = "information_request"
+
+    word_count = len(query.split())
+    if word_count > 10 or "complexity" in categories:
+        complexity = "high"
+    elif word_count < 5:
+        complexity = "low"
+    else:
+        complexity = "medium"
+
+    return QueryClassification(
+        needs_graph="graph" in categories,
+        needs_internet="internet" in categories,
+        intent=intent,
+        complexity=complexity,
+        needs_current_info="current_info" in categories,
+    )
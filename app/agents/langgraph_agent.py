@@ -14,19 +14,57 @@ def search(query: str) -> str:
     """
     return f"Results for {query}"
 from langchain_core.messages import HumanMessage
-import json
-import re
+from collections import Counter
+import asyncio
+import orjson
 
-from app.tools.graph_tool import search_knowledge_graph
-from app.tools.internet_tool import internet_tool
+from app.agents.state import SimpleAgentState
+from app.tools.graph_tool import search_knowledge_graph_async
+from app.tools.internet_tool import get_internet_tool
 from app.config import GEMINI_API_KEY
 from app.utils.logger import log_event
 from app.utils.formatters import format_sources, create_structured_output
+from app.utils.cache import TTLCache, SemanticCache
+from app.utils.embeddings import embed_batch
+
+# Prompt skeleton built once at import; per-call work is a single
+# format with the two dynamic fields.
+_PROMPT_TEMPLATE = """
+        Based on the following information, provide a comprehensive answer to the query.
+
+        QUERY: {query}
+
+        INFORMATION:
+        {context_text}
+
+        Please provide:
+        1. A clear main answer
+        2. 3-5 key points
+        3. A brief summary
+
+        Format as JSON:
+        {{
+            "answer": "your answer",
+            "key_points": ["point1", "point2", "point3"],
+            "summary": "brief summary"
+        }}
+        """.format
 
 class SimpleLangGraphAgent:
+    # Compiled once and shared across instances - graph compilation walks
+    # nodes/edges and builds runnables, which is wasted work on
+    # re-instantiation (tests, workers, reloads). Node callbacks only
+    # touch per-call state plus self.llm, which is identical across
+    # instances, so sharing the first compile is safe.
+    _COMPILED_GRAPH = None
+
     def __init__(self):
         self.llm = self._setup_llm()
-        self.graph = self._build_graph()
+        if SimpleLangGraphAgent._COMPILED_GRAPH is None:
+            SimpleLangGraphAgent._COMPILED_GRAPH = self._build_graph()
+        self.graph = SimpleLangGraphAgent._COMPILED_GRAPH
+        self.answer_cache = TTLCache(maxsize=1024, ttl=300)
+        self.semantic_cache = SemanticCache(maxlen=512, ttl=300, threshold=0.92)
         log_event("SIMPLE_AGENT", "Simple LangGraph agent initialized")
     
     def _setup_llm(self):
@@ -48,7 +86,7 @@ class SimpleLangGraphAgent:
     
     def _build_graph(self):
         """Build a simple LangGraph workflow"""
-        workflow = StateGraph(dict)
+        workflow = StateGraph(SimpleAgentState)
         
         workflow.add_node("search", self._search_node)
         workflow.add_node("generate", self._generate_node)
@@ -60,150 +98,203 @@ class SimpleLangGraphAgent:
         
         return workflow.compile()
     
-    def _search_node(self, state):
+    async def _search_node(self, state):
         query = state.get("query", "")
         options = state.get("options", {})
-        
+
         log_event("SEARCH_NODE", f"Searching for: {query}")
-        
+
         all_results = []
-        
+
+        # Both searches are I/O-bound, so run them concurrently instead of
+        # back-to-back - total latency becomes max() instead of sum().
+        tasks = []
+        task_labels = []
+
         if options.get("use_graph", True):
-            try:
-                graph_results = search_knowledge_graph(query, options.get("max_results", 3))
-                all_results.extend(graph_results)
-                log_event("GRAPH_SEARCH", f"Found {len(graph_results)} graph results")
-            except Exception as e:
-                log_event("GRAPH_SEARCH_ERROR", f"Graph search failed: {str(e)}", "error")
-        
+            tasks.append(search_knowledge_graph_async(
+                query, options.get("max_results", 3)
+            ))
+            task_labels.append("GRAPH_SEARCH")
+
         if options.get("use_internet", True):
-            try:
-                internet_results = internet_tool.search_internet(query, options.get("max_results", 3))
-                all_results.extend(internet_results)
-                log_event("INTERNET_SEARCH", f"Found {len(internet_results)} internet results")
-            except Exception as e:
-                log_event("INTERNET_SEARCH_ERROR", f"Internet search failed: {str(e)}", "error")
-        
-        state["all_results"] = all_results
-        state["total_sources"] = len(all_results)
-        
-        return state
+            # Resolve the tool inside the worker so a cold-start model
+            # load happens off the event loop too.
+            tasks.append(asyncio.to_thread(
+                lambda: get_internet_tool().search_internet(
+                    query, options.get("max_results", 3)
+                )
+            ))
+            task_labels.append("INTERNET_SEARCH")
+
+        if tasks:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for label, result in zip(task_labels, results):
+                if isinstance(result, Exception):
+                    log_event(f"{label}_ERROR", f"{label.replace('_', ' ').title()} failed: {str(result)}", "error")
+                else:
+                    all_results.extend(result)
+                    log_event(label, f"Found {len(result)} results")
+
+        # Return only the delta - the all_results reducer merges it
+        # without re-copying the rest of the state.
+        return {
+            "all_results": all_results,
+            "total_sources": len(all_results)
+        }
     
-    def _generate_node(self, state):
+    async def _generate_node(self, state):
         """Generate the final answer"""
         query = state.get("query", "")
         all_results = state.get("all_results", [])
         
         if not all_results:
-            state["answer"] = "I couldn't find enough relevant information to answer your question."
-            state["sources"] = []
-            state["structured_output"] = {
-                "key_points": ["No information found"],
-                "summary": "Unable to generate answer due to insufficient information"
+            return {
+                "answer": "I couldn't find enough relevant information to answer your question.",
+                "sources": [],
+                "structured_output": {
+                    "key_points": ["No information found"],
+                    "summary": "Unable to generate answer due to insufficient information"
+                }
             }
-            return state
-        
+
         sources = format_sources(all_results)
-        
+
+        context_text, type_counts = self._digest(all_results)
+
         if self.llm:
             try:
-                context_text = self._format_contexts(all_results)
                 prompt = self._create_prompt(query, context_text)
-                
-                response = self.llm.invoke([HumanMessage(content=prompt)])
+
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
                 parsed_response = self._parse_response(response.content)
-                
-                state["answer"] = parsed_response["answer"]
-                state["structured_output"] = {
-                    "key_points": parsed_response["key_points"],
-                    "summary": parsed_response["summary"]
+
+                update = {
+                    "answer": parsed_response["answer"],
+                    "structured_output": {
+                        "key_points": parsed_response["key_points"],
+                        "summary": parsed_response["summary"]
+                    }
                 }
-                
+
             except Exception as e:
                 log_event("LLM_GENERATION_ERROR", f"LLM generation failed: {str(e)}", "error")
-                state = self._generate_fallback_answer(state, all_results)
+                update = self._generate_fallback_answer(all_results, type_counts)
         else:
-            state = self._generate_fallback_answer(state, all_results)
-        
-        state["sources"] = sources
-        return state
+            update = self._generate_fallback_answer(all_results, type_counts)
+
+        update["sources"] = sources
+        return update
     
-    def _format_contexts(self, results):
-        context_text = ""
+    def _digest(self, results):
+        """Single pass over results: prompt context text plus per-type counts"""
+        parts = []
+        counts = Counter()
         for i, result in enumerate(results, 1):
-            context_text += f"\n--- Source {i} ({result.get('type', 'unknown')}) ---\n"
-            context_text += f"Title: {result.get('title', 'N/A')}\n"
-            context_text += f"Content: {result.get('content', '')}\n"
-        return context_text
+            get = result.get
+            result_type = get('type', 'unknown')
+            counts[result_type] += 1
+            parts.append(
+                f"\n--- Source {i} ({result_type}) ---\n"
+                f"Title: {get('title', 'N/A')}\n"
+                f"Content: {get('content', '')}\n"
+            )
+        return "".join(parts), counts
     
     def _create_prompt(self, query, context_text):
-        return f"""
-        Based on the following information, provide a comprehensive answer to the query.
-        
-        QUERY: {query}
-        
-        INFORMATION:
-        {context_text}
-        
-        Please provide:
-        1. A clear main answer
-        2. 3-5 key points
-        3. A brief summary
-        
-        Format as JSON:
-        {{
-            "answer": "your answer",
-            "key_points": ["point1", "point2", "point3"],
-            "summary": "brief summary"
-        }}
-        """
+        return _PROMPT_TEMPLATE(query=query, context_text=context_text)
     
     def _parse_response(self, response_text):
         """Parse the LLM response"""
-        try:
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except:
-            pass
-        
+        # Find the JSON span by brace positions instead of a greedy
+        # DOTALL regex, which backtracks badly on malformed output.
+        start = response_text.find('{')
+        if start != -1:
+            end = response_text.rfind('}') + 1
+            if end > start:
+                try:
+                    parsed = orjson.loads(response_text[start:end])
+                except orjson.JSONDecodeError:
+                    pass
+                else:
+                    if isinstance(parsed, dict):
+                        return parsed
+
         return {
             "answer": response_text,
             "key_points": ["See main answer for details"],
             "summary": response_text[:100] + "..." if len(response_text) > 100 else response_text
         }
     
-    def _generate_fallback_answer(self, state, results):
-        graph_count = len([r for r in results if r.get('type') == 'graph'])
-        internet_count = len([r for r in results if r.get('type') == 'internet'])
-        
-        state["answer"] = (
-            f"I found information about your query from {len(results)} sources "
-            f"({graph_count} from knowledge graph, {internet_count} from web search). "
-            f"Configure LLM for detailed AI responses."
-        )
-        state["structured_output"] = {
-            "key_points": [
-                f"Graph sources: {graph_count}",
-                f"Internet sources: {internet_count}",
-                "Fallback mode active",
-                "LLM not configured"
-            ],
-            "summary": f"Found {len(results)} information sources"
+    def _generate_fallback_answer(self, results, type_counts=None):
+        if type_counts is None:
+            type_counts = Counter(r.get('type', 'unknown') for r in results)
+        graph_count = type_counts.get('graph', 0)
+        internet_count = type_counts.get('internet', 0)
+
+        return {
+            "answer": (
+                f"I found information about your query from {len(results)} sources "
+                f"({graph_count} from knowledge graph, {internet_count} from web search). "
+                f"Configure LLM for detailed AI responses."
+            ),
+            "structured_output": {
+                "key_points": [
+                    f"Graph sources: {graph_count}",
+                    f"Internet sources: {internet_count}",
+                    "Fallback mode active",
+                    "LLM not configured"
+                ],
+                "summary": f"Found {len(results)} information sources"
+            }
         }
-        return state
     
-    def process_query(self, query, options=None, context=None):
+    def _cache_key(self, query, options):
+        query_norm = " ".join(query.lower().split())
+        options_key = tuple(sorted((options or {}).items()))
+        return (query_norm, options_key)
+
+    def _query_embedding(self, query):
+        try:
+            return embed_batch([query])[0]
+        except Exception as e:
+            log_event("CACHE_EMBED_ERROR", f"Query embedding failed: {str(e)}", "error")
+            return None
+
+    def _cached_response(self, cached, context):
+        response = dict(cached)
+        response["cached"] = True
+        if context:
+            response["context"] = context
+        return response
+
+    async def process_query(self, query, options=None, context=None):
         try:
             log_event("AGENT_PROCESS", f"Processing: {query[:50]}...")
-            
+
+            # Tier 1: exact match on normalized query + options.
+            cache_key = self._cache_key(query, options)
+            cached = self.answer_cache.get(cache_key)
+            if cached is not None:
+                log_event("ANSWER_CACHE", "Exact cache hit - skipping pipeline")
+                return self._cached_response(cached, context)
+
+            # Tier 2: semantic match on the query embedding. The encode
+            # is a model forward pass, so run it in a worker thread
+            # instead of blocking the event loop.
+            embedding = await asyncio.to_thread(self._query_embedding, query)
+            if embedding is not None:
+                cached = self.semantic_cache.lookup(embedding)
+                if cached is not None:
+                    return self._cached_response(cached, context)
+
             initial_state = {
                 "query": query,
                 "options": options or {},
                 "context": context or {}
             }
-            
-            final_state = self.graph.invoke(initial_state)
+
+            final_state = await self.graph.ainvoke(initial_state)
             
             response = {
                 "status": "success",
@@ -213,7 +304,11 @@ class SimpleLangGraphAgent:
                     "structured_output": final_state["structured_output"]
                 }
             }
-            
+
+            self.answer_cache.set(cache_key, dict(response))
+            if embedding is not None:
+                self.semantic_cache.add(embedding, dict(response))
+
             if context:
                 response["context"] = context
             
@@ -229,4 +324,46 @@ class SimpleLangGraphAgent:
                     "message": f"Failed to process query: {str(e)}"
                 }
             }
+
+    async def process_query_stream(self, query, options=None, context=None):
+        """Stream the answer as NDJSON lines: sources first, then tokens
+        as the LLM produces them, so clients get a first byte at
+        first-token time instead of full-generation time."""
+        try:
+            log_event("AGENT_STREAM", f"Streaming: {query[:50]}...")
+
+            state = {
+                "query": query,
+                "options": options or {},
+                "context": context or {}
+            }
+            search_update = await self._search_node(state)
+            all_results = search_update.get("all_results", [])
+            sources = format_sources(all_results)
+
+            yield orjson.dumps({"type": "sources", "sources": sources}) + b"\n"
+
+            if self.llm and all_results:
+                context_text, _ = self._digest(all_results)
+                prompt = self._create_prompt(query, context_text)
+                async for chunk in self.llm.astream([HumanMessage(content=prompt)]):
+                    content = getattr(chunk, "content", "")
+                    if content:
+                        yield orjson.dumps({"type": "token", "content": content}) + b"\n"
+            else:
+                fallback = self._generate_fallback_answer(all_results)
+                yield orjson.dumps({"type": "answer", "answer": fallback["answer"]}) + b"\n"
+
+            yield orjson.dumps({"type": "done"}) + b"\n"
+
+        except Exception as e:
+            log_event("AGENT_STREAM_ERROR", f"Streaming failed: {str(e)}", "error")
+            yield orjson.dumps({
+                "type": "error",
+                "error": {
+                    "code": "PROCESSING_ERROR",
+                    "message": f"Failed to process query: {str(e)}"
+                }
+            }) + b"\n"
+
 langgraph_agent = SimpleLangGraphAgent()
\ No newline at end of file
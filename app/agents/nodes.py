@@ -1,173 +1,236 @@
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+from langchain_core.messages import HumanMessage
 from app.agents.state import AgentState
-from app.tools.graph_tool import search_knowledge_graph
-from app.tools.internet_tool import internet_tool
+from app.tools.graph_tool import search_knowledge_graph_async
+from app.tools.internet_tool import get_internet_tool
 from app.utils.logger import log_event
+from app.agents._classify import classify
 from typing import List, Dict, Any
+import asyncio
 
-def route_query(state: AgentState) -> AgentState:
+def route_query(state: AgentState) -> Dict[str, Any]:
     query = state["query"]
-    options = state["options"]
-    
+
     log_event("ROUTER", f"Routing query: {query}")
-    query_lower = query.lower()
-    
-    next_steps = ["analyze_query"]
-    
-    if options.get("use_graph", True) and _needs_graph_search(query_lower):
-        next_steps.append("search_graph")
-    
-    if options.get("use_internet", True) and _needs_internet_search(query_lower):
-        next_steps.append("search_internet")
-    
-    next_steps.append("generate_answer")
-    
-    state["next_step"] = next_steps[0] if next_steps else "generate_answer"
-    state["steps_completed"].append("route_query")
-    state["reasoning"].append(f"Query routed to steps: {', '.join(next_steps)}")
-    
-    return state
+
+    return {
+        "steps_completed": ["route_query"],
+        "reasoning": [f"Query routed for parallel search dispatch: {query[:50]}"]
+    }
+
+def dispatch_searches(state: AgentState) -> List[Send]:
+    """Fan out to all enabled search nodes in parallel via the Send API"""
+    options = state["options"]
+    classification = classify(state["query"])
+
+    sends = []
+
+    if options.get("use_graph", True) and classification.needs_graph:
+        sends.append(Send("search_graph", state))
+
+    if options.get("use_internet", True) and classification.needs_internet:
+        sends.append(Send("search_internet", state))
+        sends.append(Send("search_semantic", state))
+
+    if not sends:
+        # Nothing matched the routing heuristics - fall back to graph search
+        # so the answer node always has at least one branch feeding it.
+        sends.append(Send("search_graph", state))
+
+    return sends
 
 def _needs_graph_search(query: str) -> bool:
-    graph_keywords = [
-        "what is", "define", "explain", "concept", "theory", 
-        "relationship", "how does", "compare", "difference between"
-    ]
-    return any(keyword in query for keyword in graph_keywords)
+    return classify(query).needs_graph
 
 def _needs_internet_search(query: str) -> bool:
-    internet_keywords = [
-        "latest", "recent", "news", "update", "current", "2024", "2025",
-        "today", "yesterday", "this week", "this month", "trending"
-    ]
-    return any(keyword in query for keyword in internet_keywords)
+    return classify(query).needs_internet
 
-def analyze_query(state: AgentState) -> AgentState:
+def analyze_query(state: AgentState) -> Dict[str, Any]:
     query = state["query"]
-    
+
     log_event("ANALYZER", f"Analyzing query: {query}")
-    
+
+    classification = classify(query)
+
     analysis = {
-        "intent": "information_request",
-        "complexity": "medium",
+        "intent": classification.intent,
+        "complexity": classification.complexity,
         "needs_facts": True,
-        "needs_current_info": False,
+        "needs_current_info": classification.needs_current_info,
         "expected_sources": ["graph"]
     }
-    
-    query_lower = query.lower()
-    
-    if any(word in query_lower for word in ["what is", "define", "explain"]):
-        analysis["intent"] = "definition"
-        analysis["needs_facts"] = True
-    elif any(word in query_lower for word in ["how to", "steps", "guide"]):
-        analysis["intent"] = "instructions"
-    elif any(word in query_lower for word in ["compare", "difference", "vs"]):
-        analysis["intent"] = "comparison"
-    
-    if len(query.split()) > 10 or any(word in query_lower for word in ["complex", "advanced", "detailed"]):
-        analysis["complexity"] = "high"
-    elif len(query.split()) < 5:
-        analysis["complexity"] = "low"
-    
-    if any(word in query_lower for word in ["latest", "recent", "news", "update"]):
-        analysis["needs_current_info"] = True
+
+    if classification.needs_current_info:
         analysis["expected_sources"].append("internet")
-    
-    state["reasoning"].append(f"Query analysis: {analysis}")
-    state["steps_completed"].append("analyze_query")
-    state["next_step"] = "search_graph" if state["options"].get("use_graph", True) else "search_internet"
-    
-    return state
-
-def search_graph(state: AgentState) -> AgentState:
+
+    return {
+        "reasoning": [f"Query analysis: {analysis}"],
+        "steps_completed": ["analyze_query"]
+    }
+
+async def search_graph(state: AgentState) -> Dict[str, Any]:
     if not state["options"].get("use_graph", True):
-        state["steps_completed"].append("search_graph")
-        state["next_step"] = "search_internet"
-        return state
-    
+        return {"steps_completed": ["search_graph"]}
+
     query = state["query"]
     max_results = state["options"].get("max_results", 5)
-    
+
     log_event("GRAPH_NODE", f"Searching graph for: {query}")
-    
+
     try:
-        results = search_knowledge_graph(query, max_results)
-        state["graph_results"] = results
-        state["all_contexts"].extend(results)
-        state["reasoning"].append(f"Found {len(results)} graph results")
-        
+        results = await search_knowledge_graph_async(query, max_results)
+        return {
+            "graph_results": results,
+            "all_contexts": results,
+            "steps_completed": ["search_graph"],
+            "reasoning": [f"Found {len(results)} graph results"]
+        }
+
     except Exception as e:
         log_event("GRAPH_NODE_ERROR", f"Graph search failed: {str(e)}", "error")
-        state["last_error"] = f"Graph search error: {str(e)}"
-    
-    state["steps_completed"].append("search_graph")
-    state["next_step"] = "search_internet" if state["options"].get("use_internet", True) else "generate_answer"
-    
-    return state
-
-def search_internet(state: AgentState) -> AgentState:
+        return {
+            "steps_completed": ["search_graph"],
+            "reasoning": [f"Graph search error: {str(e)}"]
+        }
+
+async def search_internet(state: AgentState) -> Dict[str, Any]:
     if not state["options"].get("use_internet", True):
-        state["steps_completed"].append("search_internet")
-        state["next_step"] = "generate_answer"
-        return state
-    
+        return {"steps_completed": ["search_internet"]}
+
     query = state["query"]
     max_results = state["options"].get("max_results", 5)
-    
+
     log_event("INTERNET_NODE", f"Searching internet for: {query}")
-    
+
     try:
-        internet_results = internet_tool.search_internet(query, max_results)
-        state["internet_results"] = internet_results
-        state["all_contexts"].extend(internet_results)
-        
-        semantic_results = internet_tool.semantic_search(query, max_results // 2)
-        state["semantic_results"] = semantic_results
-        state["all_contexts"].extend(semantic_results)
-        
-        state["reasoning"].append(f"Found {len(internet_results)} internet results and {len(semantic_results)} semantic results")
-        
+        # Resolve the tool inside the worker so a cold-start model load
+        # happens off the event loop too.
+        internet_results = await asyncio.to_thread(
+            lambda: get_internet_tool().search_internet(query, max_results)
+        )
+        return {
+            "internet_results": internet_results,
+            "all_contexts": internet_results,
+            "steps_completed": ["search_internet"],
+            "reasoning": [f"Found {len(internet_results)} internet results"]
+        }
+
     except Exception as e:
         log_event("INTERNET_NODE_ERROR", f"Internet search failed: {str(e)}", "error")
-        state["last_error"] = f"Internet search error: {str(e)}"
-    
-    state["steps_completed"].append("search_internet")
-    state["next_step"] = "generate_answer"
-    
-    return state
-
-def should_continue(state: AgentState) -> str:
-    """Determine if the agent should continue or finish"""
-    has_context = len(state["all_contexts"]) > 0
-    max_iterations_reached = state["iterations"] >= 5
-    
-    if max_iterations_reached:
-        state["max_iterations_reached"] = True
-        return "finish"
-    
-    if state["next_step"] == "generate_answer" and has_context:
-        return "generate_answer"
-    elif state["next_step"] and state["next_step"] != "generate_answer":
-        return "continue"
+        return {
+            "steps_completed": ["search_internet"],
+            "reasoning": [f"Internet search error: {str(e)}"]
+        }
+
+async def search_semantic(state: AgentState) -> Dict[str, Any]:
+    if not state["options"].get("use_internet", True):
+        return {"steps_completed": ["search_semantic"]}
+
+    query = state["query"]
+    max_results = state["options"].get("max_results", 5)
+
+    log_event("SEMANTIC_NODE", f"Semantic search for: {query}")
+
+    try:
+        semantic_results = await asyncio.to_thread(
+            lambda: get_internet_tool().semantic_search(query, max_results // 2)
+        )
+        return {
+            "semantic_results": semantic_results,
+            "all_contexts": semantic_results,
+            "steps_completed": ["search_semantic"],
+            "reasoning": [f"Found {len(semantic_results)} semantic results"]
+        }
+
+    except Exception as e:
+        log_event("SEMANTIC_NODE_ERROR", f"Semantic search failed: {str(e)}", "error")
+        return {
+            "steps_completed": ["search_semantic"],
+            "reasoning": [f"Semantic search error: {str(e)}"]
+        }
+
+async def generate_answer(state: AgentState) -> Dict[str, Any]:
+    """Fan-in node: all search branches feed this, so the accumulated
+    all_contexts is complete by the time the answer is generated."""
+    # Imported here so building the workflow does not construct the
+    # agent singleton (and its LLM client) at module import.
+    from app.agents.langgraph_agent import langgraph_agent
+
+    query = state["query"]
+    all_contexts = state["all_contexts"]
+
+    if not all_contexts:
+        return {
+            "final_answer": "I couldn't find enough relevant information to answer your question.",
+            "steps_completed": ["generate_answer"],
+            "reasoning": ["No context gathered - skipping generation"]
+        }
+
+    context_text, type_counts = langgraph_agent._digest(all_contexts)
+
+    if langgraph_agent.llm:
+        try:
+            prompt = langgraph_agent._create_prompt(query, context_text)
+            response = await langgraph_agent.llm.ainvoke([HumanMessage(content=prompt)])
+            parsed = langgraph_agent._parse_response(response.content)
+            answer = parsed["answer"]
+        except Exception as e:
+            log_event("GENERATE_NODE_ERROR", f"LLM generation failed: {str(e)}", "error")
+            answer = langgraph_agent._generate_fallback_answer(all_contexts, type_counts)["answer"]
     else:
-        return "finish"
+        answer = langgraph_agent._generate_fallback_answer(all_contexts, type_counts)["answer"]
+
+    return {
+        "final_answer": answer,
+        "steps_completed": ["generate_answer"],
+        "reasoning": [f"Generated answer from {len(all_contexts)} contexts"]
+    }
 
-def format_final_answer(state: AgentState) -> AgentState:
+def format_final_answer(state: AgentState) -> Dict[str, Any]:
     """Format the final answer in the required structure"""
     from app.utils.formatters import format_sources, create_structured_output
-    
+
     sources = format_sources(state["all_contexts"])
-    
+
     structured_output = create_structured_output(
-        answer=state["final_answer"],
+        answer=state.get("final_answer", ""),
         sources=sources,
         reasoning=state["reasoning"]
     )
-    
-    state["sources"] = sources
-    state["structured_output"] = structured_output
-    state["should_continue"] = False
-    
+
     log_event("FINAL_FORMAT", "Formatted final answer with sources")
-    
-    return state
\ No newline at end of file
+
+    return {
+        "sources": sources,
+        "structured_output": structured_output,
+        "should_continue": False,
+        "steps_completed": ["format_final_answer"]
+    }
+
+def build_search_workflow():
+    """Build the fan-out search workflow: router dispatches the enabled
+    search nodes in parallel, generate_answer fans them back in, and
+    format_final_answer shapes the response."""
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("route_query", route_query)
+    workflow.add_node("search_graph", search_graph)
+    workflow.add_node("search_internet", search_internet)
+    workflow.add_node("search_semantic", search_semantic)
+    workflow.add_node("generate_answer", generate_answer)
+    workflow.add_node("format_final_answer", format_final_answer)
+
+    workflow.add_edge(START, "route_query")
+    workflow.add_conditional_edges(
+        "route_query",
+        dispatch_searches,
+        ["search_graph", "search_internet", "search_semantic"]
+    )
+    workflow.add_edge("search_graph", "generate_answer")
+    workflow.add_edge("search_internet", "generate_answer")
+    workflow.add_edge("search_semantic", "generate_answer")
+    workflow.add_edge("generate_answer", "format_final_answer")
+    workflow.add_edge("format_final_answer", END)
+
+    return workflow.compile()
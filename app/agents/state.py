@@ -1,6 +1,20 @@
 from typing import TypedDict, List, Dict, Any, Annotated, Optional
 import operator
 
+class SimpleAgentState(TypedDict, total=False):
+    query: str
+    options: Dict[str, Any]
+    context: Dict[str, Any]
+
+    # Reducer-managed so search nodes return only their delta and
+    # LangGraph merges without copying the accumulated state per hop.
+    all_results: Annotated[List[Dict[str, Any]], operator.add]
+    total_sources: int
+
+    answer: str
+    sources: List[Dict[str, Any]]
+    structured_output: Dict[str, Any]
+
 class AgentState(TypedDict):
     query: str
     context: Dict[str, Any]
@@ -9,15 +23,15 @@ class AgentState(TypedDict):
     
     messages: Annotated[List[Dict[str, Any]], operator.add]
     current_step: str
-    steps_completed: List[str]
+    steps_completed: Annotated[List[str], operator.add]
     next_step: Optional[str]
-    
+
     graph_results: List[Dict[str, Any]]
     internet_results: List[Dict[str, Any]]
     semantic_results: List[Dict[str, Any]]
-    all_contexts: List[Dict[str, Any]]
-    
-    reasoning: List[str]
+    all_contexts: Annotated[List[Dict[str, Any]], operator.add]
+
+    reasoning: Annotated[List[str], operator.add]
     tool_calls: List[Dict[str, Any]]
     iterations: int
     
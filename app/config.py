@@ -18,13 +18,17 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 LLM_MODEL = "gemini-2.5-flash"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Inference backend for the embedding model: "onnx" runs through ONNX
+# Runtime when the installed sentence-transformers supports it,
+# "torch" forces the default PyTorch path.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx")
 MAX_RESULTS = 5
 REQUEST_TIMEOUT = 30
 
 MAX_RECURSION_LIMIT = 15
 AGENT_TIMEOUT = 60
 
-def validate_config():
+def _compute_missing_config():
     missing = []
     if not TAVILY_API_KEY:
         missing.append("TAVILY_API_KEY")
@@ -32,4 +36,11 @@ def validate_config():
         missing.append("GEMINI_API_KEY")
     if not NEO4J_PASSWORD or NEO4J_PASSWORD == "your_neo4j_password_here":
         missing.append("NEO4J_PASSWORD (update in .env file)")
-    return missing
\ No newline at end of file
+    return tuple(missing)
+
+# Config values never change at runtime, so the missing-key check is
+# computed once at import; /health and startup reuse the cached tuple.
+MISSING_CONFIG = _compute_missing_config()
+
+def validate_config():
+    return MISSING_CONFIG
\ No newline at end of file
@@ -1,19 +1,23 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from app.config import NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD
 from app.utils.logger import log_event
+import time
 
 class Neo4jConnector:
     def __init__(self):
         self.connected = False
         self.driver = None
+        self.async_driver = None
+        self._health_cache = (0.0, None)
         self._connect()
-    
+
     def _connect(self):
         try:
             self.driver = GraphDatabase.driver(
-                NEO4J_URI, 
+                NEO4J_URI,
                 auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
-                connection_timeout=10  # 10 second timeout
+                connection_timeout=10,  # 10 second timeout
+                max_connection_pool_size=50
             )
             with self.driver.session() as session:
                 result = session.run("RETURN 1 as test")
@@ -24,12 +28,43 @@ class Neo4jConnector:
                 else:
                     self.connected = False
                     log_event("NEO4J_WARNING", "Neo4j connection test failed", "warning")
-                    
+
+            if self.connected:
+                self._ensure_indexes()
+                # Pooled async driver shared across the event loop, so
+                # concurrent queries reuse connections instead of paying
+                # session setup per call.
+                self.async_driver = AsyncGraphDatabase.driver(
+                    NEO4J_URI,
+                    auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
+                    connection_timeout=10,
+                    max_connection_pool_size=50
+                )
+
         except Exception as e:
             self.connected = False
             self.driver = None
+            self.async_driver = None
             log_event("NEO4J_WARNING", f"Neo4j not available: {str(e)} - Using fallback mode", "warning")
-    
+
+    def _ensure_indexes(self):
+        # Concept search goes through a Lucene full-text index instead
+        # of an unindexed CONTAINS scan; the title index speeds up the
+        # exact-title lookups in get_related_concepts.
+        try:
+            with self.driver.session() as session:
+                session.run(
+                    "CREATE FULLTEXT INDEX conceptText IF NOT EXISTS "
+                    "FOR (n:Concept) ON EACH [n.title, n.summary]"
+                )
+                session.run(
+                    "CREATE INDEX concept_title IF NOT EXISTS "
+                    "FOR (n:Concept) ON (n.title)"
+                )
+            log_event("NEO4J_INDEX", "Ensured concept search indexes")
+        except Exception as e:
+            log_event("NEO4J_INDEX_ERROR", f"Failed to ensure indexes: {str(e)}", "warning")
+
     def close(self):
         if self.driver:
             try:
@@ -37,23 +72,59 @@ class Neo4jConnector:
                 log_event("NEO4J_CLOSE", "Neo4j connection closed")
             except Exception as e:
                 log_event("NEO4J_CLOSE_ERROR", f"Error closing Neo4j connection: {str(e)}", "error")
-    
+
+    async def aclose(self):
+        if self.async_driver:
+            try:
+                await self.async_driver.close()
+                log_event("NEO4J_CLOSE", "Neo4j async connection closed")
+            except Exception as e:
+                log_event("NEO4J_CLOSE_ERROR", f"Error closing async Neo4j connection: {str(e)}", "error")
+
     def execute_query(self, query, parameters=None):
         if not self.connected or not self.driver:
             return []
-        
+
         try:
-            with self.driver.session() as session:
+            # fetch_size streams records from the server in batches as
+            # the iteration below consumes them, instead of the driver
+            # materializing the whole result first - unbounded queries
+            # stay memory-safe.
+            with self.driver.session(fetch_size=1000) as session:
                 result = session.run(query, parameters or {})
                 return [record.data() for record in result]
         except Exception as e:
             log_event("NEO4J_QUERY_ERROR", f"Query failed: {str(e)}", "error")
             return []
+
+    async def execute_query_async(self, query, parameters=None):
+        if not self.connected or not self.async_driver:
+            return []
+
+        try:
+            async with self.async_driver.session(fetch_size=1000) as session:
+                result = await session.run(query, parameters or {})
+                return [record.data() async for record in result]
+        except Exception as e:
+            log_event("NEO4J_QUERY_ERROR", f"Async query failed: {str(e)}", "error")
+            return []
     
-    def health_check(self):
+    def health_check(self, ttl=5.0):
+        # Load balancers hammer /health; avoid a DB round-trip per probe
+        # by reusing the last result for a few seconds.
+        now = time.monotonic()
+        checked_at, cached = self._health_cache
+        if cached is not None and now - checked_at < ttl:
+            return cached
+
+        result = self._do_health_check()
+        self._health_cache = (now, result)
+        return result
+
+    def _do_health_check(self):
         if not self.connected:
             return {"status": "disconnected", "message": "Neo4j not available"}
-        
+
         try:
             with self.driver.session() as session:
                 result = session.run("CALL dbms.components() YIELD name, versions RETURN name, versions")
@@ -1,12 +1,15 @@
 from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
 from app.routes.agent import router as agent_router
 from app.db.neo4j_connector import close_driver, neo4j
 from app.utils.logger import log_event, setup_logging
 from app.config import validate_config
 from app.agents.langgraph_agent import langgraph_agent
+from app.tools.internet_tool import get_internet_tool, flush_internet_tool
 from app.middleware.auth import verify_auth
+import asyncio
 import uvicorn
 
 setup_logging()
@@ -29,7 +32,8 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
-    }
+    },
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -42,6 +46,22 @@ app.add_middleware(
 
 app.include_router(agent_router)
 
+def custom_openapi():
+    # Generate the schema once and reuse it for every /openapi.json hit.
+    if app.openapi_schema:
+        return app.openapi_schema
+    app.openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes,
+        contact=app.contact,
+        license_info=app.license_info
+    )
+    return app.openapi_schema
+
+app.openapi = custom_openapi
+
 @app.get("/")
 def root():
     status_info = {
@@ -166,7 +186,7 @@ def list_available_tools(user: str = Depends(verify_auth)):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     log_event("HTTP_ERROR", f"HTTP {exc.status_code}: {exc.detail}", "error")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=exc.detail
     )
@@ -174,7 +194,7 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     log_event("GLOBAL_ERROR", f"Unhandled exception: {str(exc)}", "error")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "status": "error",
@@ -195,14 +215,25 @@ async def startup_event():
     else:
         log_event("STARTUP", "All configurations validated successfully")
     
+    # Warm the internet tool off the event loop so the embedding model
+    # and vector store are ready before the first request needs them.
+    asyncio.create_task(asyncio.to_thread(get_internet_tool))
+
     log_event("STARTUP", "AI Agent API server started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     log_event("SHUTDOWN", "AI Agent API server shutting down...")
+    flush_internet_tool()
+    await neo4j.aclose()
     close_driver()
     log_event("SHUTDOWN", "AI Agent API server shutdown complete")
 
 if __name__ == "__main__":
     log_event("STARTUP", "Starting AI Agent API server directly")
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    try:
+        import uvloop  # noqa: F401
+        event_loop = "uvloop"
+    except ImportError:
+        event_loop = "auto"
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True, loop=event_loop)
\ No newline at end of file
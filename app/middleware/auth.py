@@ -2,16 +2,39 @@ from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from app.config import API_USERNAME, API_PASSWORD
 from app.utils.logger import log_event
+import hashlib
 import secrets
+import time
 
 security = HTTPBasic()
 
+# Verified credentials are remembered (as a keyed hash) for a short TTL
+# so repeat requests from the same client skip the digest comparisons
+# and the per-request success log. Misses still go through
+# compare_digest, so the timing-attack protection is unchanged.
+_AUTH_CACHE = {}
+_AUTH_CACHE_TTL = 60.0
+_AUTH_CACHE_MAX = 256
+
+def _auth_cache_key(username: str, password: str) -> bytes:
+    return hashlib.blake2b(
+        f"{username}:{password}".encode(), digest_size=16
+    ).digest()
+
 def verify_auth(credentials: HTTPBasicCredentials = Depends(security)):
     try:
+        cache_key = _auth_cache_key(credentials.username, credentials.password)
+        cached = _AUTH_CACHE.get(cache_key)
+        if cached is not None:
+            expires, username = cached
+            if time.monotonic() < expires:
+                return username
+            del _AUTH_CACHE[cache_key]
+
         # Constant-time comparison to prevent timing attacks
         username_correct = secrets.compare_digest(credentials.username, API_USERNAME)
         password_correct = secrets.compare_digest(credentials.password, API_PASSWORD)
-        
+
         if not (username_correct and password_correct):
             log_event("AUTH_FAILED", f"Failed authentication attempt for user: {credentials.username}", "warning")
             raise HTTPException(
@@ -27,6 +50,11 @@ def verify_auth(credentials: HTTPBasicCredentials = Depends(security)):
             )
         
         log_event("AUTH_SUCCESS", f"User authenticated: {credentials.username}")
+
+        if len(_AUTH_CACHE) >= _AUTH_CACHE_MAX:
+            _AUTH_CACHE.clear()
+        _AUTH_CACHE[cache_key] = (time.monotonic() + _AUTH_CACHE_TTL, credentials.username)
+
         return credentials.username
         
     except HTTPException:
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any
 from app.middleware.auth import verify_auth
 from app.agents.langgraph_agent import langgraph_agent
@@ -7,14 +8,39 @@ from app.utils.logger import log_event
 
 router = APIRouter()
 
+# Error payloads are constants - build them once at import instead of
+# allocating the nested dicts on every failing request.
+_EMPTY_QUERY_DETAIL = {
+    "status": "error",
+    "error": {
+        "code": "INVALID_REQUEST",
+        "message": "Query cannot be empty"
+    }
+}
+
+_INTERNAL_ERROR_DETAIL = {
+    "status": "error",
+    "error": {
+        "code": "INTERNAL_ERROR",
+        "message": "Internal server error occurred while processing your request."
+    }
+}
+
+class QueryOptions(BaseModel):
+    # Typed fields let Pydantic validate options with a specialized
+    # validator instead of walking an untyped dict per request.
+    model_config = ConfigDict(extra='ignore')
+
+    use_graph: bool = True
+    use_internet: bool = True
+    max_results: int = 5
+
 class QueryRequest(BaseModel):
     query: str
-    context: Optional[Dict[str, Any]] = {}
-    options: Optional[Dict[str, Any]] = {
-        "use_graph": True,
-        "use_internet": True, 
-        "max_results": 5
-    }
+    # Optional so explicit nulls from existing clients stay accepted;
+    # the endpoints coerce None back to the defaults.
+    context: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    options: Optional[QueryOptions] = Field(default_factory=QueryOptions)
 
 class ErrorResponse(BaseModel):
     status: str
@@ -24,9 +50,13 @@ class SuccessResponse(BaseModel):
     status: str
     response: Dict[str, Any]
 
-@router.post("/api/v1/agent/query", 
-             response_model=SuccessResponse,
-             responses={401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
+# response_model=None skips Pydantic re-validation of the agent output -
+# it is a passthrough payload serialized straight by orjson. The 200
+# schema stays in OpenAPI via the responses map.
+@router.post("/api/v1/agent/query",
+             response_model=None,
+             responses={200: {"model": SuccessResponse},
+                        401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def agent_query_endpoint(
     request: QueryRequest, 
     user: str = Depends(verify_auth)
@@ -35,36 +65,38 @@ async def agent_query_endpoint(
         log_event("LANGGRAPH_API", f"User: {user}, Query: {request.query[:100]}...")
         
         if not request.query or len(request.query.strip()) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "status": "error",
-                    "error": {
-                        "code": "INVALID_REQUEST",
-                        "message": "Query cannot be empty"
-                    }
-                }
-            )
+            raise HTTPException(status_code=400, detail=_EMPTY_QUERY_DETAIL)
         
-        result = langgraph_agent.process_query(
+        result = await langgraph_agent.process_query(
             query=request.query.strip(),
-            options=request.options,
-            context=request.context
+            options=(request.options or QueryOptions()).model_dump(),
+            context=request.context or {}
         )
-        
-        return result
-        
+
+        return ORJSONResponse(content=result)
+
     except HTTPException:
         raise
     except Exception as e:
         log_event("LANGGRAPH_API_ERROR", f"Endpoint error: {str(e)}", "error")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "status": "error",
-                "error": {
-                    "code": "INTERNAL_ERROR", 
-                    "message": "Internal server error occurred while processing your request."
-                }
-            }
-        )
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=_INTERNAL_ERROR_DETAIL)
+
+@router.post("/api/v1/agent/query/stream",
+             responses={401: {"model": ErrorResponse}})
+async def agent_query_stream_endpoint(
+    request: QueryRequest,
+    user: str = Depends(verify_auth)
+):
+    log_event("LANGGRAPH_API", f"User: {user}, Streaming query: {request.query[:100]}...")
+
+    if not request.query or len(request.query.strip()) == 0:
+        raise HTTPException(status_code=400, detail=_EMPTY_QUERY_DETAIL)
+
+    return StreamingResponse(
+        langgraph_agent.process_query_stream(
+            query=request.query.strip(),
+            options=(request.options or QueryOptions()).model_dump(),
+            context=request.context or {}
+        ),
+        media_type="application/x-ndjson"
+    )
\ No newline at end of file
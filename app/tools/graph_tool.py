@@ -1,63 +1,110 @@
+import re
 from langchain_core.tools import tool
 from app.db.neo4j_connector import neo4j
 from app.utils.logger import log_event
 from typing import List, Dict, Any
 
+# The relationship subquery collects at most 3 edges server-side;
+# collecting everything and slicing in Python materialized thousands
+# of rows for hub nodes and shipped them over Bolt just to be dropped.
+_CONCEPT_SEARCH_QUERY = """
+CALL db.index.fulltext.queryNodes('conceptText', $query) YIELD node AS n, score
+CALL {
+    WITH n
+    MATCH (n)-[r]-(related:Concept)
+    WITH {relation: type(r), target: related.title} AS rel
+    LIMIT 3
+    RETURN collect(rel) AS relationships
+}
+RETURN n.title as title, n.summary as summary, n.category as category,
+       n.confidence as confidence, n.id as node_id, relationships
+ORDER BY score DESC
+LIMIT $max_results
+"""
+
+# Unindexed scan kept as a fallback for databases predating the
+# full-text index and for queries Lucene rejects.
+_CONCEPT_SCAN_QUERY = """
+MATCH (n:Concept)
+WHERE toLower(n.title) CONTAINS toLower($query)
+   OR toLower(n.summary) CONTAINS toLower($query)
+CALL {
+    WITH n
+    MATCH (n)-[r]-(related:Concept)
+    WITH {relation: type(r), target: related.title} AS rel
+    LIMIT 3
+    RETURN collect(rel) AS relationships
+}
+RETURN n.title as title, n.summary as summary, n.category as category,
+       n.confidence as confidence, n.id as node_id, relationships
+LIMIT $max_results
+"""
+
+def _format_graph_results(results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    formatted_results = []
+    for result in results:
+        content = result["summary"]
+        relationships = result.get("relationships", [])
+        if relationships:
+            rel_text = " Related to: " + ", ".join([
+                f"{rel['target']} ({rel['relation']})"
+                for rel in relationships  # Already limited to 3 in Cypher
+            ])
+            content += rel_text
+
+        formatted_results.append({
+            "type": "graph",
+            "title": result["title"],
+            "content": content,
+            "reference": f"graph:{result['node_id']}",
+            "confidence": float(result.get("confidence", 0.8)),
+            "category": result.get("category", "general"),
+            "relationships": relationships
+        })
+
+    log_event("GRAPH_TOOL", f"Found {len(formatted_results)} graph results for: {query}")
+    return formatted_results
+
 @tool
 def search_knowledge_graph(query: str, max_results: int = 3) -> list:
     """Search the knowledge graph for relevant information.
-    
+
     Args:
         query: The search query string
         max_results: Maximum number of results to return (default: 3)
-    
+
     Returns:
         A list of search results with title, content, and source information
     """
     try:
         if not neo4j.connected:
             return _get_fallback_graph_data(query, max_results)
-        
-        search_query = """
-        MATCH (n:Concept)
-        WHERE toLower(n.title) CONTAINS toLower($query)
-           OR toLower(n.summary) CONTAINS toLower($query)
-        OPTIONAL MATCH (n)-[r]-(related:Concept)
-        WITH n, collect({relation: type(r), target: related.title}) as relationships
-        RETURN n.title as title, n.summary as summary, n.category as category, 
-               n.confidence as confidence, n.id as node_id, relationships
-        LIMIT $max_results
-        """
-        
-        results = neo4j.execute_query(search_query, {
-            "query": query, 
-            "max_results": max_results
-        })
-        
-        formatted_results = []
-        for result in results:
-            content = result["summary"]
-            relationships = result.get("relationships", [])
-            if relationships:
-                rel_text = " Related to: " + ", ".join([
-                    f"{rel['target']} ({rel['relation']})" 
-                    for rel in relationships[:3]  # Limit to 3 relationships
-                ])
-                content += rel_text
-            
-            formatted_results.append({
-                "type": "graph",
-                "title": result["title"],
-                "content": content,
-                "reference": f"graph:{result['node_id']}",
-                "confidence": float(result.get("confidence", 0.8)),
-                "category": result.get("category", "general"),
-                "relationships": relationships
-            })
-        
-        log_event("GRAPH_TOOL", f"Found {len(formatted_results)} graph results for: {query}")
-        return formatted_results
-        
+
+        parameters = {"query": query, "max_results": max_results}
+        results = neo4j.execute_query(_CONCEPT_SEARCH_QUERY, parameters)
+        if not results:
+            results = neo4j.execute_query(_CONCEPT_SCAN_QUERY, parameters)
+
+        return _format_graph_results(results, query)
+
+    except Exception as e:
+        log_event("GRAPH_TOOL_ERROR", f"Graph search failed: {str(e)}", "error")
+        return _get_fallback_graph_data(query, max_results)
+
+async def search_knowledge_graph_async(query: str, max_results: int = 3) -> list:
+    """Async variant of search_knowledge_graph using the pooled async driver,
+    so graph searches can run concurrently without blocking the event loop."""
+    try:
+        if not neo4j.connected:
+            return _get_fallback_graph_data(query, max_results)
+
+        parameters = {"query": query, "max_results": max_results}
+        results = await neo4j.execute_query_async(_CONCEPT_SEARCH_QUERY, parameters)
+        if not results:
+            results = await neo4j.execute_query_async(_CONCEPT_SCAN_QUERY, parameters)
+
+        return _format_graph_results(results, query)
+
     except Exception as e:
         log_event("GRAPH_TOOL_ERROR", f"Graph search failed: {str(e)}", "error")
         return _get_fallback_graph_data(query, max_results)
@@ -106,8 +153,10 @@ def get_related_concepts(concept_name: str, max_related: int = 3) -> List[Dict[s
         log_event("RELATED_CONCEPTS_ERROR", f"Related concepts search failed: {str(e)}", "error")
         return []
 
-def _get_fallback_graph_data(query: str, max_results: int):
-    fallback_knowledge_base = {
+# Frozen module-level data: the fallback entries plus an inverted
+# word -> keys index built once at import, so lookups are dict hits on
+# the query tokens instead of a scan over every key and its words.
+_FALLBACK_KNOWLEDGE_BASE = {
         "ai": {
             "type": "graph",
             "title": "Artificial Intelligence",
@@ -156,27 +205,45 @@ def _get_fallback_graph_data(query: str, max_results: int):
             "confidence": 0.79,
             "category": "technology"
         }
-    }
-    
+}
+
+_FALLBACK_BY_WORD = {}
+for _key in _FALLBACK_KNOWLEDGE_BASE:
+    for _word in _key.split():
+        _FALLBACK_BY_WORD.setdefault(_word, []).append(_key)
+
+_AI_TERMS = ('ai', 'artificial', 'intelligence', 'machine', 'learning')
+
+def _get_fallback_graph_data(query: str, max_results: int):
     query_lower = query.lower()
-    relevant_data = []
-    
-    for key, value in fallback_knowledge_base.items():
-        if key in query_lower:
-            relevant_data.append(value)
-    
-    if not relevant_data:
-        for key, value in fallback_knowledge_base.items():
-            if any(word in query_lower for word in key.split()):
-                relevant_data.append(value)
-    
-    if not relevant_data and any(term in query_lower for term in ['ai', 'artificial', 'intelligence', 'machine', 'learning']):
+
+    # One pass over the query tokens: candidate keys come from the
+    # inverted index; a key counts as an exact match when the full
+    # (possibly multi-word) key appears in the query. Tokens are
+    # stripped of punctuation so "what is nlp?" still hits "nlp".
+    exact_matches = []
+    word_matches = []
+    seen = set()
+    for token in re.findall(r"[a-z0-9]+", query_lower):
+        for key in _FALLBACK_BY_WORD.get(token, ()):
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = _FALLBACK_KNOWLEDGE_BASE[key]
+            if key in query_lower:
+                exact_matches.append(entry)
+            else:
+                word_matches.append(entry)
+
+    relevant_data = exact_matches or word_matches
+
+    if not relevant_data and any(term in query_lower for term in _AI_TERMS):
         relevant_data = [
-            fallback_knowledge_base["ai"],
-            fallback_knowledge_base["machine learning"],
-            fallback_knowledge_base["deep learning"]
+            _FALLBACK_KNOWLEDGE_BASE["ai"],
+            _FALLBACK_KNOWLEDGE_BASE["machine learning"],
+            _FALLBACK_KNOWLEDGE_BASE["deep learning"]
         ]
-    
-    result = relevant_data[:max_results] if relevant_data else list(fallback_knowledge_base.values())[:max_results]
+
+    result = relevant_data[:max_results] if relevant_data else list(_FALLBACK_KNOWLEDGE_BASE.values())[:max_results]
     log_event("GRAPH_FALLBACK", f"Using fallback graph data: {len(result)} results for: {query}")
     return result
\ No newline at end of file
@@ -1,48 +1,113 @@
 from langchain.tools import tool
 from tavily import TavilyClient
-from sentence_transformers import SentenceTransformer
+import asyncio
+import threading
 import faiss
 import numpy as np
+import orjson
 import pickle
 import os
 from typing import List, Dict, Any
-from app.config import TAVILY_API_KEY, EMBEDDING_MODEL
+from app.config import TAVILY_API_KEY
+from app.utils.cache import TTLCache
+from app.utils.embeddings import get_embedder, embed_batch
 from app.utils.logger import log_event
 
+_INDEX_PATH = "vector_store/faiss.index"
+_DOCUMENTS_PATH = "vector_store/documents.jsonl"
+_LEGACY_PICKLE_PATH = "vector_store/faiss_index.pkl"
+
+# Minimum vectors before training the SQ8 quantizer; below this the
+# store runs as an exact flat index (see _maybe_upgrade_index).
+_SQ_TRAIN_THRESHOLD = 256
+
 class InternetSearchTool:
     def __init__(self):
         self.tavily_available = bool(TAVILY_API_KEY)
         if self.tavily_available:
             self.tavily = TavilyClient(api_key=TAVILY_API_KEY)
-        
-        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+
+        # Repeat queries within the TTL skip the Tavily round trip -
+        # usually the single slowest hop in the pipeline - and stay
+        # within the API rate limits.
+        self._search_cache = TTLCache(maxsize=1024, ttl=300)
+
+        self.embedding_model = get_embedder()
         self.vector_store = None
         self.documents = []
+        self._documents_persisted = 0
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        # FAISS indexes are not safe for concurrent mutation or
+        # serialization; every add/search/write_index on the index goes
+        # through this lock (the search nodes run in thread workers).
+        self._index_lock = threading.Lock()
         self._load_vector_store()
         log_event("INTERNET_TOOL", f"Initialized - Tavily: {self.tavily_available}")
-    
+
     def _load_vector_store(self):
         try:
-            if os.path.exists("vector_store/faiss_index.pkl"):
-                with open("vector_store/faiss_index.pkl", "rb") as f:
+            if os.path.exists(_INDEX_PATH):
+                # downcast so isinstance/hnsw checks see the concrete type.
+                self.vector_store = faiss.downcast_index(faiss.read_index(_INDEX_PATH))
+                if os.path.exists(_DOCUMENTS_PATH):
+                    with open(_DOCUMENTS_PATH, "rb") as f:
+                        self.documents = [orjson.loads(line) for line in f if line.strip()]
+                log_event("VECTOR_STORE", f"Loaded {len(self.documents)} documents")
+            elif os.path.exists(_LEGACY_PICKLE_PATH):
+                # One-time migration from the old pickled format.
+                with open(_LEGACY_PICKLE_PATH, "rb") as f:
                     data = pickle.load(f)
                     self.vector_store = data["index"]
                     self.documents = data["documents"]
-                log_event("VECTOR_STORE", f"Loaded {len(self.documents)} documents")
+                log_event("VECTOR_STORE", f"Migrated {len(self.documents)} documents from legacy pickle")
+                self._save_vector_store()
+            self._documents_persisted = len(self.documents)
         except Exception as e:
             log_event("VECTOR_STORE_ERROR", f"Failed to load vector store: {str(e)}", "error")
             self.vector_store = None
             self.documents = []
-    
+            self._documents_persisted = 0
+
     def _save_vector_store(self):
         try:
-            with open("vector_store/faiss_index.pkl", "wb") as f:
-                pickle.dump({
-                    "index": self.vector_store,
-                    "documents": self.documents
-                }, f)
+            os.makedirs("vector_store", exist_ok=True)
+            with self._index_lock:
+                if self.vector_store is not None:
+                    faiss.write_index(self.vector_store, _INDEX_PATH)
+
+                # Documents are append-only: persist just the lines added
+                # since the last save instead of rewriting the whole store.
+                if self._documents_persisted < len(self.documents):
+                    with open(_DOCUMENTS_PATH, "ab") as f:
+                        for doc in self.documents[self._documents_persisted:]:
+                            f.write(orjson.dumps(doc) + b"\n")
+                    self._documents_persisted = len(self.documents)
         except Exception as e:
             log_event("VECTOR_STORE_SAVE_ERROR", f"Failed to save vector store: {str(e)}", "error")
+
+    def _schedule_save(self, delay: float = 2.0):
+        # Write-behind: persistence happens on a debounced background
+        # timer so the request path returns as soon as the in-memory
+        # index is updated; bursts of adds coalesce into one write.
+        with self._save_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(delay, self._flush_pending)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def _flush_pending(self):
+        with self._save_lock:
+            self._save_timer = None
+        self._save_vector_store()
+
+    def flush(self):
+        """Persist any pending vector-store changes immediately"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._save_vector_store()
     
     
     def search_internet(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
@@ -58,7 +123,13 @@ class InternetSearchTool:
         try:
             if not self.tavily_available:
                 return self._get_mock_internet_data(query, max_results)
-            
+
+            cache_key = (query, max_results, "advanced")
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                log_event("INTERNET_SEARCH", f"Cache hit for: {query}")
+                return cached
+
             response = self.tavily.search(
                 query=query,
                 max_results=max_results,
@@ -67,7 +138,7 @@ class InternetSearchTool:
             
             results = []
             for item in response.get("results", []):
-                result_data = {
+                results.append({
                     "type": "internet",
                     "title": item.get("title", "No title"),
                     "content": item.get("content", ""),
@@ -75,10 +146,10 @@ class InternetSearchTool:
                     "confidence": min(0.9, float(item.get("score", 70)) / 100),
                     "published_date": item.get("published_date", ""),
                     "source": "tavily"
-                }
-                results.append(result_data)
-                self._add_to_vector_store(result_data)
-            
+                })
+
+            self._search_cache.set(cache_key, results)
+            self._add_batch_to_vector_store(results)
             log_event("INTERNET_SEARCH", f"Found {len(results)} internet results for: {query}")
             return results
             
@@ -87,6 +158,37 @@ class InternetSearchTool:
             return self._get_mock_internet_data(query, max_results)
     
     
+    async def search_internet_batch(self, queries: List[str], max_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """Run several internet searches concurrently.
+
+        Args:
+            queries: Sub-queries to dispatch in one fan-out
+            max_results: Maximum number of results per sub-query
+
+        Returns:
+            One result list per query, in the same order as the input
+        """
+        if not queries:
+            return []
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.search_internet, query, max_results)
+              for query in queries),
+            return_exceptions=True
+        )
+
+        batched = []
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                log_event("INTERNET_BATCH_ERROR", f"Sub-query failed: {query}: {str(result)}", "error")
+                batched.append([])
+            else:
+                batched.append(result)
+
+        log_event("INTERNET_BATCH", f"Completed {len(batched)} concurrent searches")
+        return batched
+
+
     def search_news(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search for recent news articles related to the query.
         
@@ -103,7 +205,13 @@ class InternetSearchTool:
             
             # Add news context to query
             news_query = f"news {query} 2024"
-            
+
+            cache_key = (news_query, max_results, "basic")
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                log_event("NEWS_SEARCH", f"Cache hit for: {query}")
+                return cached
+
             response = self.tavily.search(
                 query=news_query,
                 max_results=max_results,
@@ -112,7 +220,7 @@ class InternetSearchTool:
             
             results = []
             for item in response.get("results", []):
-                result_data = {
+                results.append({
                     "type": "news",
                     "title": item.get("title", "No title"),
                     "content": item.get("content", ""),
@@ -120,10 +228,10 @@ class InternetSearchTool:
                     "confidence": min(0.85, float(item.get("score", 70)) / 100),
                     "published_date": item.get("published_date", ""),
                     "source": "tavily_news"
-                }
-                results.append(result_data)
-                self._add_to_vector_store(result_data)
-            
+                })
+
+            self._search_cache.set(cache_key, results)
+            self._add_batch_to_vector_store(results)
             log_event("NEWS_SEARCH", f"Found {len(results)} news results for: {query}")
             return results
             
@@ -146,20 +254,29 @@ class InternetSearchTool:
             if self.vector_store is None or len(self.documents) == 0:
                 return []
             
-            query_embedding = self.embedding_model.encode([query])
-            distances, indices = self.vector_store.search(
-                query_embedding.astype('float32'), 
-                min(max_results, len(self.documents))
-            )
-            
-            results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx < len(self.documents):
-                    doc = self.documents[idx].copy()
-                    doc["confidence"] = max(0.1, 1 - (distance / 10))
-                    doc["source"] = "semantic_search"
-                    results.append(doc)
-            
+            query_embedding = embed_batch([query]).astype('float32')
+            faiss.normalize_L2(query_embedding)
+
+            with self._index_lock:
+                if hasattr(self.vector_store, "hnsw"):
+                    self.vector_store.hnsw.efSearch = 64
+
+                scores, indices = self.vector_store.search(
+                    query_embedding,
+                    min(max_results, len(self.documents))
+                )
+
+            # Normalized inner product is the cosine similarity; clip the
+            # whole row in one NumPy op instead of per-hit Python min/max.
+            hit_indices = indices[0]
+            mask = (0 <= hit_indices) & (hit_indices < len(self.documents))
+            confidences = np.clip(scores[0][mask], 0.1, 1.0)
+
+            results = [
+                {**self.documents[idx], "confidence": float(conf), "source": "semantic_search"}
+                for idx, conf in zip(hit_indices[mask], confidences)
+            ]
+
             log_event("SEMANTIC_SEARCH", f"Found {len(results)} semantic results for: {query}")
             return results
             
@@ -204,22 +321,85 @@ class InternetSearchTool:
         ]
         return mock_news[:max_results]
     
+    def _new_index(self, dimension: int):
+        # HNSW over normalized vectors: sub-linear ANN search where
+        # inner product equals cosine similarity, instead of the
+        # brute-force O(N*d) scan of a flat L2 index. Vectors are
+        # stored scalar-quantized to int8, cutting the store to a
+        # quarter of FP32 and letting FAISS use int8 SIMD kernels.
+        index = faiss.IndexHNSWSQ(
+            dimension, faiss.ScalarQuantizer.QT_8bit, 32,
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = 200
+        return index
+
+    def _maybe_upgrade_index(self):
+        # Called with _index_lock held. SQ8 ranges calibrated from one
+        # tiny search response clamp most later embeddings, so the
+        # quantized HNSW index is only built once enough vectors have
+        # accumulated to give per-dimension statistics that hold up.
+        if self.vector_store.ntotal < _SQ_TRAIN_THRESHOLD:
+            return
+
+        vectors = self.vector_store.reconstruct_n(0, self.vector_store.ntotal)
+        index = self._new_index(vectors.shape[1])
+        index.train(vectors)
+        index.add(vectors)
+        self.vector_store = index
+        log_event("VECTOR_STORE", f"Trained quantized index on {len(vectors)} vectors")
+
     def _add_to_vector_store(self, document):
+        self._add_batch_to_vector_store([document])
+
+    def _add_batch_to_vector_store(self, documents):
+        if not documents:
+            return
+
         try:
-            text = f"{document['title']} {document['content'][:500]}"
-            embedding = self.embedding_model.encode([text])
-            
-            if self.vector_store is None:
-                dimension = embedding.shape[1]
-                self.vector_store = faiss.IndexFlatL2(dimension)
-            
-            self.vector_store.add(embedding.astype('float32'))
-            self.documents.append(document)
-            
-            if len(self.documents) % 5 == 0:
-                self._save_vector_store()
-                
+            # One batched forward pass and one index add for the whole
+            # result set instead of a model call per document.
+            texts = [f"{doc['title']} {doc['content'][:500]}" for doc in documents]
+            embeddings = embed_batch(texts)
+
+            embeddings = embeddings.astype('float32', copy=False)
+            faiss.normalize_L2(embeddings)
+
+            with self._index_lock:
+                if self.vector_store is None:
+                    # Too few vectors yet to calibrate the SQ8 ranges -
+                    # start exact and quantize once a real sample exists.
+                    self.vector_store = faiss.IndexFlatIP(embeddings.shape[1])
+
+                self.vector_store.add(embeddings)
+                self.documents.extend(documents)
+
+                if isinstance(self.vector_store, faiss.IndexFlatIP):
+                    self._maybe_upgrade_index()
+
+            self._schedule_save()
+
         except Exception as e:
             log_event("VECTOR_ADD_ERROR", f"Failed to add to vector store: {str(e)}", "error")
 
-internet_tool = InternetSearchTool()
\ No newline at end of file
+# Lazy singleton: constructing the tool loads the embedding model and
+# reads the vector store off disk, which should not happen at import
+# time (it slows every worker boot, test collection, and reload).
+_internet_tool = None
+_internet_tool_lock = threading.Lock()
+
+def get_internet_tool() -> InternetSearchTool:
+    global _internet_tool
+    if _internet_tool is None:
+        # Double-checked lock: construction takes seconds (model load +
+        # index read), and the startup warm-up thread races the first
+        # request - without the lock both would build an instance.
+        with _internet_tool_lock:
+            if _internet_tool is None:
+                _internet_tool = InternetSearchTool()
+    return _internet_tool
+
+def flush_internet_tool():
+    """Flush pending vector-store writes if the tool was ever initialized"""
+    if _internet_tool is not None:
+        _internet_tool.flush()
\ No newline at end of file
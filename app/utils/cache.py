@@ -0,0 +1,98 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Any, Optional
+from app.utils.logger import log_event
+
+class TTLCache:
+    """Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+    Safe for concurrent callers - the Tavily cache is read from
+    to_thread workers, so lookup, expiry, and eviction are serialized
+    by a lock."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if time.monotonic() > expires:
+                self._store.pop(key, None)
+                return None
+
+            self._store.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+            self._store[key] = (time.monotonic() + self.ttl, value)
+
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+class SemanticCache:
+    """Cache keyed on query embeddings: near-duplicate queries (cosine
+    similarity above the threshold) reuse the stored value instead of
+    re-running the full pipeline"""
+
+    def __init__(self, maxlen: int = 512, ttl: float = 300.0, threshold: float = 0.92):
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = deque(maxlen=maxlen)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        return embedding
+
+    def lookup(self, embedding) -> Optional[Any]:
+        try:
+            embedding = self._normalize(embedding)
+            now = time.monotonic()
+
+            best_value = None
+            best_score = 0.0
+            for stored_embedding, expires, value in self._entries:
+                if now > expires:
+                    continue
+                score = float(np.dot(stored_embedding, embedding))
+                if score > best_score:
+                    best_score = score
+                    best_value = value
+
+            if best_value is not None and best_score >= self.threshold:
+                log_event("SEMANTIC_CACHE", f"Cache hit with similarity {best_score:.3f}")
+                return best_value
+            return None
+
+        except Exception as e:
+            log_event("SEMANTIC_CACHE_ERROR", f"Semantic cache lookup failed: {str(e)}", "error")
+            return None
+
+    def add(self, embedding, value):
+        try:
+            self._entries.append((
+                self._normalize(embedding),
+                time.monotonic() + self.ttl,
+                value
+            ))
+        except Exception as e:
+            log_event("SEMANTIC_CACHE_ERROR", f"Semantic cache add failed: {str(e)}", "error")
@@ -0,0 +1,72 @@
+import numpy as np
+import threading
+from collections import OrderedDict
+from typing import List
+from app.config import EMBEDDING_MODEL, EMBEDDING_BACKEND
+from app.utils.logger import log_event
+
+# One embedding model shared by every caller (semantic search, vector
+# store writes, the answer cache), loaded once instead of per consumer.
+_model = None
+
+# Repeated texts (typically repeat queries) skip the transformer
+# entirely; bounded LRU so memory stays flat. Callers run in thread
+# workers, so cache reads and eviction are serialized by a lock.
+_encode_cache = OrderedDict()
+_encode_cache_lock = threading.Lock()
+_ENCODE_CACHE_MAX = 4096
+
+def get_embedder():
+    global _model
+    if _model is None:
+        _model = _load_model()
+    return _model
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+
+    if EMBEDDING_BACKEND != "torch":
+        try:
+            # ONNX runtime backend: same embeddings, straight-through
+            # C++ inference instead of the PyTorch dispatch and
+            # autograd bookkeeping per encode call.
+            model = SentenceTransformer(EMBEDDING_MODEL, backend=EMBEDDING_BACKEND)
+            log_event("EMBEDDER", f"Loaded {EMBEDDING_MODEL} with {EMBEDDING_BACKEND} backend")
+            return model
+        except Exception as e:
+            log_event("EMBEDDER", f"{EMBEDDING_BACKEND} backend unavailable ({str(e)}) - using torch", "warning")
+
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    log_event("EMBEDDER", f"Loaded {EMBEDDING_MODEL} with torch backend")
+    return model
+
+def embed_batch(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """Embed a list of texts, batching cache misses in one forward pass"""
+    found = {}
+    with _encode_cache_lock:
+        for text in texts:
+            embedding = _encode_cache.get(text)
+            if embedding is not None:
+                _encode_cache.move_to_end(text)
+                found[text] = embedding
+
+    # Encode outside the lock - a concurrent embed_batch may evict
+    # entries meanwhile, so rows are built from this local dict rather
+    # than re-read from the cache.
+    miss_texts = [text for text in dict.fromkeys(texts) if text not in found]
+    if miss_texts:
+        embeddings = get_embedder().encode(
+            miss_texts,
+            batch_size=batch_size,
+            convert_to_numpy=True
+        )
+        found.update(zip(miss_texts, embeddings))
+        with _encode_cache_lock:
+            for text, embedding in zip(miss_texts, embeddings):
+                _encode_cache[text] = embedding
+            while len(_encode_cache) > _ENCODE_CACHE_MAX:
+                _encode_cache.popitem(last=False)
+
+    # np.stack copies, so callers that normalize in place cannot
+    # corrupt the cached vectors.
+    return np.stack([found[text] for text in texts])
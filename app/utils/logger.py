@@ -1,6 +1,7 @@
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
 import sys
 
 # Create logs directory
@@ -9,54 +10,71 @@ os.makedirs("logs", exist_ok=True)
 # Configure logging
 def setup_logging():
     """Setup logging configuration"""
+    root_logger = logging.getLogger()
+
+    # Idempotent: a second call (module import + main.py) must not
+    # stack another queue handler and listener.
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root_logger.handlers):
+        return logging.getLogger("ai_agent")
+
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # Create handlers
-    file_handler = logging.FileHandler("logs/agent.log", encoding='utf-8')
+
+    # Real handlers run on the listener thread, so log calls on the
+    # request path never block on file I/O; delay=True defers opening
+    # the file until the first record.
+    file_handler = logging.handlers.RotatingFileHandler(
+        "logs/agent.log", maxBytes=10 * 1024 * 1024, backupCount=3,
+        encoding='utf-8', delay=True
+    )
     file_handler.setFormatter(formatter)
-    
+
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    
+
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.daemon = True
+    listener.start()
+
     # Configure root logger
-    root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-    
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
     # Create our specific logger
     logger = logging.getLogger("ai_agent")
     logger.setLevel(logging.INFO)
-    
+
     return logger
 
 # Initialize logger
 logger = setup_logging()
 
+# Level-name -> bound method lookup instead of an if/elif chain per call.
+_LEVELS = {
+    "error": logger.error,
+    "warning": logger.warning,
+    "debug": logger.debug,
+    "info": logger.info,
+}
+
 def log_event(event_type: str, message: str, level: str = "info"):
     """
     Structured event logging with different levels
-    
+
     Args:
         event_type: Type of event (e.g., "API_REQUEST", "GRAPH_SEARCH")
         message: Log message
         level: Log level ("info", "warning", "error", "debug")
     """
-    timestamp = datetime.now().isoformat()
-    log_message = f"[{timestamp}] {event_type}: {message}"
-    
-    if level == "error":
-        logger.error(log_message)
-    elif level == "warning":
-        logger.warning(log_message)
-    elif level == "debug":
-        logger.debug(log_message)
-    else:
-        logger.info(log_message)
+    # The formatter already emits %(asctime)s, and %-style args defer
+    # interpolation until the record is actually handled.
+    _LEVELS.get(level, logger.info)("%s: %s", event_type, message)
 
 def log_api_request(user: str, endpoint: str, method: str, status_code: int = None):
     """Log API request details"""
@@ -75,6 +93,8 @@ def log_agent_step(step_name: str, query: str, results_count: int = None):
 
 def log_tool_usage(tool_name: str, query: str, execution_time: float = None):
     """Log tool usage and performance"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     message = f"Tool: {tool_name}, Query: {query}"
     if execution_time:
         message += f", Time: {execution_time:.2f}s"